@@ -0,0 +1,58 @@
+# add_alert_snapshot.py
+# Add the precomputed alert snapshot table to an existing database
+
+from flask import Flask
+from models import db, ReorderPoint, AlertSnapshot, refresh_alert_snapshot
+
+# Create Flask app for migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory.db'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+db.init_app(app)
+
+def migrate_alert_snapshot():
+    """Create alert_snapshot table and fill it from current stock levels"""
+    print("Adding Alert Snapshot table...")
+    print("Precomputing alert levels so the alerts dashboard reads one table")
+    print("-" * 60)
+
+    with app.app_context():
+        try:
+            # Step 1: Create AlertSnapshot table
+            print("Step 1: Creating alert snapshot table...")
+            db.create_all()  # This will create the AlertSnapshot table
+            print("✅ AlertSnapshot table created successfully")
+
+            # Step 2: Populate snapshot for every active reorder point
+            print("\nStep 2: Computing alert levels for existing products...")
+            refresh_alert_snapshot(db.session.connection())
+            db.session.commit()
+
+            active_count = ReorderPoint.query.filter(ReorderPoint.is_active == True).count()
+            snapshot_count = AlertSnapshot.query.count()
+            alert_count = AlertSnapshot.query.filter(AlertSnapshot.level != 'ok').count()
+
+            print(f"✅ Alert snapshot ready:")
+            print(f"   - {active_count} active reorder points")
+            print(f"   - {snapshot_count} snapshot rows")
+            print(f"   - {alert_count} products currently need attention")
+
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            print("Your existing data is safe and unchanged.")
+            return False
+
+if __name__ == '__main__':
+    success = migrate_alert_snapshot()
+
+    if success:
+        print("\n🚨 Alert Snapshot Active!")
+        print("Snapshot rows now refresh automatically on product and reorder point changes.")
+    else:
+        print("\n⚠️  Migration encountered issues.")
+        print("Please check the errors above and try again.")
@@ -0,0 +1,49 @@
+# add_performance_indexes.py
+# Add indexes backing the dashboard, reports and alert queries to an existing database
+
+from flask import Flask
+from sqlalchemy import text
+from models import db, Product, StockTransaction, ReorderPoint
+
+# Create Flask app for migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory.db'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+db.init_app(app)
+
+def migrate_performance_indexes():
+    """Create any missing model indexes on existing tables"""
+    print("Adding performance indexes...")
+    print("Indexing stock levels, stock value, transaction history by product and type, and reorder points")
+    print("-" * 60)
+
+    with app.app_context():
+        try:
+            # db.create_all() skips tables that already exist, so create their indexes directly
+            for model in (Product, StockTransaction, ReorderPoint):
+                for index in model.__table__.indexes:
+                    index.create(db.engine, checkfirst=True)
+                    print(f"✅ {index.name} on {model.__tablename__}")
+            
+            # Superseded by ix_stock_transaction_created_change (same leading column, also covers quantity_change)
+            with db.engine.begin() as connection:
+                connection.execute(text("DROP INDEX IF EXISTS ix_stock_transaction_created"))
+            print("✅ Old ix_stock_transaction_created index removed")
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Migration failed: {str(e)}")
+            print("Your existing data is safe and unchanged.")
+            return False
+
+if __name__ == '__main__':
+    success = migrate_performance_indexes()
+
+    if success:
+        print("\n⚡ Performance Indexes Active!")
+    else:
+        print("\n⚠️  Migration encountered issues.")
+        print("Please check the errors above and try again.")
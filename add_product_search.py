@@ -0,0 +1,70 @@
+# add_product_search.py
+# Add the product text search index to an existing database
+
+from flask import Flask
+from sqlalchemy import text
+from models import db, PRODUCT_SEARCH_SQLITE_DDL, PRODUCT_SEARCH_POSTGRESQL_DDL
+
+# Create Flask app for migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory.db'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+db.init_app(app)
+
+def migrate_product_search():
+    """Create the product search index and fill it from existing products"""
+    print("Adding Product Search index...")
+    print("Indexing product name, SKU and description for substring search")
+    print("-" * 60)
+
+    with app.app_context():
+        try:
+            dialect = db.engine.dialect.name
+
+            # Step 1: Create index objects for this database
+            print(f"Step 1: Creating search index ({dialect})...")
+            if dialect == 'sqlite':
+                statements = PRODUCT_SEARCH_SQLITE_DDL
+            elif dialect == 'postgresql':
+                statements = PRODUCT_SEARCH_POSTGRESQL_DDL
+            else:
+                print(f"⚠️  No search index for {dialect}; searches keep using LIKE")
+                return True
+
+            for statement in statements:
+                db.session.execute(text(statement))
+            print("✅ Search index created")
+            
+            # Per-column trigram indexes are replaced by the combined search text index
+            if dialect == 'postgresql':
+                for index_name in ('ix_product_name_trgm', 'ix_product_sku_trgm', 'ix_product_description_trgm'):
+                    db.session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                print("✅ Old per-column search indexes removed")
+
+            # Step 2: Index products that existed before the sync triggers
+            if dialect == 'sqlite':
+                print("\nStep 2: Indexing existing products...")
+                db.session.execute(text("INSERT INTO product_fts(product_fts) VALUES ('rebuild')"))
+                indexed = db.session.execute(text("SELECT count(*) FROM product_fts")).scalar()
+                print(f"✅ {indexed} products indexed")
+
+            db.session.commit()
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            print("Your existing data is safe and unchanged.")
+            return False
+
+if __name__ == '__main__':
+    success = migrate_product_search()
+
+    if success:
+        print("\n🔍 Product Search Index Active!")
+        print("The index now stays in sync with product changes automatically.")
+    else:
+        print("\n⚠️  Migration encountered issues.")
+        print("Please check the errors above and try again.")
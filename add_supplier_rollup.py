@@ -0,0 +1,58 @@
+# add_supplier_rollup.py
+# Add the precomputed supplier rollup table to an existing database
+
+from flask import Flask
+from models import db, Supplier, SupplierRollup, refresh_supplier_rollup
+
+# Create Flask app for migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory.db'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+db.init_app(app)
+
+def migrate_supplier_rollup():
+    """Create supplier_rollup table and fill it from current products"""
+    print("Adding Supplier Rollup table...")
+    print("Precomputing supplier totals so the dashboard reads one small table")
+    print("-" * 60)
+
+    with app.app_context():
+        try:
+            # Step 1: Create SupplierRollup table
+            print("Step 1: Creating supplier rollup table...")
+            db.create_all()  # This will create the SupplierRollup table
+            print("✅ SupplierRollup table created successfully")
+
+            # Step 2: Populate rollup for every supplier
+            print("\nStep 2: Computing totals for existing suppliers...")
+            refresh_supplier_rollup(db.session.connection())
+            db.session.commit()
+
+            supplier_count = Supplier.query.count()
+            rollup_count = SupplierRollup.query.count()
+            active_count = SupplierRollup.query.filter(SupplierRollup.product_count > 0).count()
+
+            print(f"✅ Supplier rollup ready:")
+            print(f"   - {supplier_count} suppliers")
+            print(f"   - {rollup_count} rollup rows")
+            print(f"   - {active_count} suppliers with products")
+
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            print("Your existing data is safe and unchanged.")
+            return False
+
+if __name__ == '__main__':
+    success = migrate_supplier_rollup()
+
+    if success:
+        print("\n📦 Supplier Rollup Active!")
+        print("Rollup rows now refresh automatically on product and supplier changes.")
+    else:
+        print("\n⚠️  Migration encountered issues.")
+        print("Please check the errors above and try again.")
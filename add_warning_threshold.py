@@ -0,0 +1,61 @@
+# add_warning_threshold.py
+# Add the generated warning_threshold column to an existing reorder_point table
+
+from flask import Flask
+from sqlalchemy import text, inspect
+from models import db, ReorderPoint
+
+# Create Flask app for migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory.db'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+db.init_app(app)
+
+def migrate_warning_threshold():
+    """Add reorder_point.warning_threshold (minimum_quantity * 0.5) and its index"""
+    print("Adding Warning Threshold column...")
+    print("Storing half the minimum quantity so alert queries compare against a column")
+    print("-" * 60)
+
+    with app.app_context():
+        try:
+            # Step 1: Add generated column (skipped if it already exists)
+            print("Step 1: Adding warning_threshold column...")
+            columns = [column['name'] for column in inspect(db.engine).get_columns('reorder_point')]
+            if 'warning_threshold' in columns:
+                print("✅ warning_threshold column already exists")
+            else:
+                # SQLite can only add VIRTUAL generated columns to an existing table
+                storage = 'VIRTUAL' if db.engine.dialect.name == 'sqlite' else 'STORED'
+                db.session.execute(text(
+                    "ALTER TABLE reorder_point ADD COLUMN warning_threshold REAL "
+                    f"GENERATED ALWAYS AS (minimum_quantity * 0.5) {storage}"
+                ))
+                db.session.commit()
+                print(f"✅ warning_threshold column added ({storage})")
+
+            # Step 2: Create the threshold index
+            print("\nStep 2: Creating reorder point threshold index...")
+            for index in ReorderPoint.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+                print(f"✅ {index.name} on {ReorderPoint.__tablename__}")
+
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            print("Your existing data is safe and unchanged.")
+            return False
+
+if __name__ == '__main__':
+    success = migrate_warning_threshold()
+
+    if success:
+        print("\n🚨 Warning Threshold Active!")
+        print("The database keeps warning_threshold in sync with minimum_quantity.")
+    else:
+        print("\n⚠️  Migration encountered issues.")
+        print("Please check the errors above and try again.")
@@ -0,0 +1,41 @@
+import threading
+import time
+from functools import wraps
+
+def ttl_cache(seconds):
+    """
+    Cache a function's return value in-process for a short time
+    
+    Usage:
+    @ttl_cache(30)
+    def expensive_stats():
+        ...
+    
+    Arguments must be hashable; each distinct argument tuple is cached
+    separately. Call expensive_stats.cache_clear() to drop all entries
+    (e.g. after writes that change the underlying data).
+    """
+    def decorator(f):
+        entries = {}
+        lock = threading.Lock()
+        
+        @wraps(f)
+        def decorated_function(*args):
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(args)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            
+            value = f(*args)
+            with lock:
+                entries[args] = (now + seconds, value)
+            return value
+        
+        def cache_clear():
+            with lock:
+                entries.clear()
+        
+        decorated_function.cache_clear = cache_clear
+        return decorated_function
+    return decorator
@@ -17,6 +17,8 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///inventory.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_RECORD_QUERIES = True
+    QUERY_COUNT_WARNING = int(os.environ.get('QUERY_COUNT_WARNING', 20))  # Per-request query count that gets logged
+    RAISE_ON_LAZY_LOAD = False  # Raise instead of lazy-loading relationships (catches N+1 queries)
     
     # Session Configuration
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
@@ -73,6 +75,7 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = False
     WTF_CSRF_ENABLED = False  # Disable CSRF for testing
+    RAISE_ON_LAZY_LOAD = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///inventory_test.db'
     SERVER_NAME = 'localhost.localdomain'
 
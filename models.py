@@ -1,11 +1,29 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, case, func, select, insert, delete, inspect, text, column, literal_column, DDL, Integer
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 from datetime import datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from enum import Enum
+import sqlite3
 
 db = SQLAlchemy()
 
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Use write-ahead logging on SQLite
+    
+    WAL with synchronous=NORMAL syncs at checkpoints rather than on every
+    commit, and readers no longer block the writer during imports.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 class Supplier(db.Model):
     # Define what information we store about each supplier
     id = db.Column(db.Integer, primary_key=True)  # Unique number for each supplier
@@ -27,10 +45,10 @@ class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     sku = db.Column(db.String(50), unique=True, nullable=False)
-    description = db.Column(db.Text)
+    description = db.deferred(db.Column(db.Text), group='detail')  # Deferred: only the edit form shows it
     price = db.Column(db.Float, nullable=False)
     quantity = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.deferred(db.Column(db.DateTime, default=datetime.utcnow), group='detail')  # Deferred with description
     
     # Connection to supplier (optional so old products don't break)
     supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id'), nullable=True)
@@ -38,9 +56,72 @@ class Product(db.Model):
     # NEW Phase 4: Relationship to stock transactions
     transactions = db.relationship('StockTransaction', backref='product', lazy=True, order_by='StockTransaction.created_at.desc()')
     
+    __table_args__ = (
+        db.Index('ix_product_quantity', 'quantity'),                  # stock status filters/counts
+        db.Index('ix_product_value', (price * quantity).self_group().desc()),  # top-N "by value" queries
+    )
+    
     def __repr__(self):
         return f'<Product {self.name}>'
 
+# Product text search indexes (name, SKU, description substring search).
+# SQLite: an FTS5 table with the trigram tokenizer, kept in sync by triggers;
+# trigram MATCH gives the same case-insensitive substring semantics as LIKE '%q%'.
+# PostgreSQL: one pg_trgm GIN index over name, SKU and description joined into a
+# single search text, so a search is one ILIKE and one index scan (not three).
+PRODUCT_SEARCH_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5("
+    "name, sku, description, content='product', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN "
+    "INSERT INTO product_fts(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN "
+    "INSERT INTO product_fts(product_fts, rowid, name, sku, description) "
+    "VALUES ('delete', old.id, old.name, old.sku, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE OF name, sku, description ON product BEGIN "
+    "INSERT INTO product_fts(product_fts, rowid, name, sku, description) "
+    "VALUES ('delete', old.id, old.name, old.sku, old.description); "
+    "INSERT INTO product_fts(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description); END",
+)
+
+PRODUCT_SEARCH_POSTGRESQL_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_trgm ON product USING gin "
+    "((name || ' ' || sku || ' ' || coalesce(description, '')) gin_trgm_ops)",
+)
+
+# Must render exactly like the ix_product_search_trgm expression (literals, not
+# bound parameters) for PostgreSQL to match the index
+PRODUCT_SEARCH_TEXT = (
+    Product.name.op('||')(literal_column("' '")).op('||')(Product.sku)
+    .op('||')(literal_column("' '")).op('||')(func.coalesce(Product.description, literal_column("''")))
+)
+
+# Run with db.create_all()/drop_all() so new databases get the search index too
+for statement in PRODUCT_SEARCH_SQLITE_DDL:
+    event.listen(Product.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in PRODUCT_SEARCH_POSTGRESQL_DDL:
+    event.listen(Product.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(Product.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS product_fts").execute_if(dialect='sqlite'))
+
+def product_search_filter(search_query):
+    """
+    Filter for products whose name, SKU or description contains search_query
+    
+    On SQLite, queries of 3+ characters go through the product_fts trigram
+    index; shorter queries (below the trigram size) and other databases use
+    one case-insensitive LIKE over PRODUCT_SEARCH_TEXT (indexed by pg_trgm
+    on PostgreSQL).
+    """
+    if len(search_query) >= 3 and db.session.get_bind().dialect.name == 'sqlite':
+        # Quote as an FTS5 phrase so the text is matched literally
+        phrase = '"' + search_query.replace('"', '""') + '"'
+        matches = text(
+            "SELECT rowid FROM product_fts WHERE product_fts MATCH :phrase"
+        ).bindparams(phrase=phrase).columns(column('rowid', Integer))
+        return Product.id.in_(matches)
+    
+    return PRODUCT_SEARCH_TEXT.icontains(search_query, autoescape=True)
+
 class StockTransaction(db.Model):
     """
     Phase 4: Track all stock movements for analytics and history
@@ -68,6 +149,12 @@ class StockTransaction(db.Model):
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # When the change occurred
     
+    __table_args__ = (
+        db.Index('ix_stock_transaction_product_created', product_id, created_at.desc()),  # per-product history
+        db.Index('ix_stock_transaction_created_change', created_at.desc(), quantity_change),  # recent activity, daily activity counts (covering)
+        db.Index('ix_stock_transaction_type_created', transaction_type, created_at.desc()),  # type-filtered history
+    )
+    
     def __repr__(self):
         return f'<StockTransaction {self.product.name}: {self.quantity_change:+d}>'
     
@@ -108,6 +195,9 @@ class ReorderPoint(db.Model):
     reorder_quantity = db.Column(db.Integer, default=50, nullable=False)     # Suggested reorder amount
     is_active = db.Column(db.Boolean, default=True, nullable=False)          # Enable/disable alerts for this product
     
+    # Generated by the database: stock below this is 'urgent' (half the minimum)
+    warning_threshold = db.Column(db.Float, db.Computed('minimum_quantity * 0.5', persisted=True))
+    
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -115,6 +205,14 @@ class ReorderPoint(db.Model):
     # Relationship back to product
     product = db.relationship('Product', backref=db.backref('reorder_point', uselist=False))
     
+    __table_args__ = (
+        # Partial index: only active reorder points are ever scanned for alerts
+        db.Index('ix_reorder_point_active', 'is_active', 'minimum_quantity',
+                 sqlite_where=is_active == True, postgresql_where=is_active == True),
+        # Alert classification compares stock against the stored urgent threshold
+        db.Index('ix_reorder_point_product_threshold', 'product_id', 'warning_threshold'),
+    )
+    
     def __repr__(self):
         return f'<ReorderPoint {self.product.name}: min={self.minimum_quantity}, reorder={self.reorder_quantity}>'
     
@@ -146,6 +244,199 @@ class ReorderPoint(db.Model):
         needed_to_reach_reorder = self.reorder_quantity - current
         return max(needed_to_reach_reorder, 0)
     
+def stock_status_counts():
+    """
+    Product totals by stock status in a single pass over the product table
+    
+    Returns a Row with total, with_stock (> 0), in_stock (>= 10),
+    low_stock (1-9), out_of_stock (0) and total_value (sum of price * quantity).
+    """
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+    
+    return db.session.execute(select(
+        func.count(Product.id).label('total'),
+        count_where(Product.quantity > 0).label('with_stock'),
+        count_where(Product.quantity >= 10).label('in_stock'),
+        count_where((Product.quantity > 0) & (Product.quantity < 10)).label('low_stock'),
+        count_where(Product.quantity == 0).label('out_of_stock'),
+        func.coalesce(func.sum(Product.price * Product.quantity), 0.0).label('total_value')
+    )).one()
+
+def supplier_product_totals():
+    """
+    Per-supplier product totals, aggregated before joining to Supplier
+    
+    Returns a subquery with supplier_id, product_count, total_stock and
+    total_value columns (one row per supplier that has products), so
+    supplier rankings group O(products) rows once and join O(suppliers).
+    """
+    return select(
+        Product.supplier_id,
+        func.count(Product.id).label('product_count'),
+        func.sum(Product.quantity).label('total_stock'),
+        func.sum(Product.price * Product.quantity).label('total_value')
+    ).where(Product.supplier_id.isnot(None)).group_by(Product.supplier_id).subquery()
+
+class AlertSnapshot(db.Model):
+    """
+    Precomputed alert status for every product with an active reorder point
+    
+    Rows are rebuilt by refresh_alert_snapshot() whenever a Product or
+    ReorderPoint is flushed, so the alerts dashboard reads one small table
+    instead of joining and classifying ReorderPoint/Product on every request.
+    """
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    
+    # Cached alert classification (same rules as ReorderPoint.alert_level)
+    level = db.Column(db.String(20), nullable=False, index=True)   # 'critical', 'urgent', 'warning', 'ok'
+    level_order = db.Column(db.Integer, nullable=False)            # 0 = critical ... 3 = ok, for sorting
+    quantity = db.Column(db.Integer, nullable=False)               # stock level when snapshot was taken
+    suggested_order = db.Column(db.Integer, nullable=False)        # ReorderPoint.suggested_order_amount
+    
+    # Metadata
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    product = db.relationship('Product')
+    
+    __table_args__ = (
+        db.Index('ix_alert_snapshot_order', 'level_order', 'quantity'),
+    )
+    
+    def __repr__(self):
+        return f'<AlertSnapshot product={self.product_id}: {self.level}>'
+
+# Alert level of a product joined to its reorder point (what alert_snapshot.level stores)
+ALERT_LEVEL = case(
+    (Product.quantity == 0, 'critical'),
+    (Product.quantity < ReorderPoint.warning_threshold, 'urgent'),
+    (Product.quantity < ReorderPoint.minimum_quantity, 'warning'),
+    else_='ok'
+)
+
+def refresh_alert_snapshot(connection, product_ids=None):
+    """
+    Rebuild alert_snapshot rows for the given products (all products if None)
+    
+    Runs as plain Core DELETE + INSERT ... SELECT on the given connection so it
+    can be called from inside a flush without re-entering the ORM.
+    """
+    snapshot = AlertSnapshot.__table__
+    minimum = ReorderPoint.minimum_quantity
+    
+    level_order = case(
+        (Product.quantity == 0, 0),
+        (Product.quantity < ReorderPoint.warning_threshold, 1),
+        (Product.quantity < minimum, 2),
+        else_=3
+    )
+    level = ALERT_LEVEL
+    suggested_order = case(
+        (ReorderPoint.reorder_quantity > Product.quantity, ReorderPoint.reorder_quantity - Product.quantity),
+        else_=0
+    )
+    
+    source = select(
+        Product.id, level, level_order, Product.quantity, suggested_order, func.now()
+    ).join(ReorderPoint, ReorderPoint.product_id == Product.id).where(ReorderPoint.is_active == True)
+    
+    clear = delete(snapshot)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        source = source.where(Product.id.in_(product_ids))
+        clear = clear.where(snapshot.c.product_id.in_(product_ids))
+    
+    connection.execute(clear)
+    connection.execute(insert(snapshot).from_select(
+        ['product_id', 'level', 'level_order', 'quantity', 'suggested_order', 'updated_at'],
+        source
+    ))
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_alert_snapshot_after_flush(session, flush_context):
+    """Keep alert_snapshot in sync with flushed Product/ReorderPoint changes"""
+    product_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Product):
+            product_ids.add(obj.id)
+        elif isinstance(obj, ReorderPoint):
+            product_ids.add(obj.product_id)
+    
+    product_ids.discard(None)
+    if product_ids:
+        refresh_alert_snapshot(session.connection(), product_ids)
+
+class SupplierRollup(db.Model):
+    """
+    Precomputed per-supplier product totals for the dashboard
+    
+    Rows are rebuilt by refresh_supplier_rollup() whenever a Product or
+    Supplier is flushed, so the dashboard reads O(suppliers) rows instead of
+    aggregating the whole product table on every request.
+    """
+    supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id', ondelete='CASCADE'), primary_key=True)
+    
+    # Cached aggregates over the supplier's products
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    total_stock = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0.0, index=True)
+    
+    # Metadata
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    supplier = db.relationship('Supplier')
+    
+    def __repr__(self):
+        return f'<SupplierRollup supplier={self.supplier_id}: {self.product_count} products>'
+
+def refresh_supplier_rollup(connection, supplier_ids=None):
+    """
+    Rebuild supplier_rollup rows for the given suppliers (all suppliers if None)
+    
+    Same DELETE + INSERT ... SELECT approach as refresh_alert_snapshot().
+    """
+    rollup = SupplierRollup.__table__
+    
+    source = select(
+        Supplier.id,
+        func.count(Product.id),
+        func.coalesce(func.sum(Product.quantity), 0),
+        func.coalesce(func.sum(Product.price * Product.quantity), 0.0),
+        func.now()
+    ).outerjoin(Product, Product.supplier_id == Supplier.id).group_by(Supplier.id)
+    
+    clear = delete(rollup)
+    if supplier_ids is not None:
+        supplier_ids = list(supplier_ids)
+        if not supplier_ids:
+            return
+        source = source.where(Supplier.id.in_(supplier_ids))
+        clear = clear.where(rollup.c.supplier_id.in_(supplier_ids))
+    
+    connection.execute(clear)
+    connection.execute(insert(rollup).from_select(
+        ['supplier_id', 'product_count', 'total_stock', 'total_value', 'updated_at'],
+        source
+    ))
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_supplier_rollup_after_flush(session, flush_context):
+    """Keep supplier_rollup in sync with flushed Product/Supplier changes"""
+    supplier_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Product):
+            # Both the current and the previous supplier need recounting
+            supplier_ids.add(obj.supplier_id)
+            supplier_ids.update(inspect(obj).attrs.supplier_id.history.deleted)
+        elif isinstance(obj, Supplier):
+            supplier_ids.add(obj.id)
+    
+    supplier_ids.discard(None)
+    if supplier_ids:
+        refresh_supplier_rollup(session.connection(), supplier_ids)
+
 class UserRole(Enum):
     """Define user roles for the inventory system"""
     ADMIN = "admin"          # Full system access, user management
@@ -12,7 +12,8 @@ from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.shapes import Drawing
 from datetime import datetime
 import io
-from models import db, Product, Supplier, StockTransaction, ReorderPoint
+from models import db, Product, Supplier, StockTransaction, ReorderPoint, stock_status_counts, supplier_product_totals
+from sqlalchemy.orm import contains_eager, joinedload
 
 class InventoryReportGenerator:
     """
@@ -365,20 +366,23 @@ class InventoryReportGenerator:
         self._create_header(story, "Inventory Summary Report", report_date)
         
         # Gather data
-        total_products = Product.query.count()
+        counts = stock_status_counts()
+        total_products = counts.total
         total_suppliers = Supplier.query.count()
         total_transactions = StockTransaction.query.count()
         
-        products_with_stock = Product.query.filter(Product.quantity > 0).count()
-        out_of_stock_products = Product.query.filter(Product.quantity == 0).count()
-        low_stock_products = Product.query.filter(Product.quantity > 0, Product.quantity < 10).count()
+        products_with_stock = counts.with_stock
+        out_of_stock_products = counts.out_of_stock
+        low_stock_products = counts.low_stock
         
         # Calculate total inventory value
-        inventory_value_query = db.session.query(db.func.sum(Product.price * Product.quantity)).scalar()
-        total_inventory_value = inventory_value_query if inventory_value_query else 0.0
+        total_inventory_value = counts.total_value
         
         # Active alerts
-        alerts_query = db.session.query(ReorderPoint, Product).join(Product).filter(
+        alerts_query = db.session.query(ReorderPoint, Product).join(Product).outerjoin(Product.supplier).options(
+            contains_eager(ReorderPoint.product),  # suggested_order_amount reads rp.product
+            contains_eager(Product.supplier)  # Supplier name comes back with each alert row
+        ).filter(
             ReorderPoint.is_active == True,
             Product.quantity < ReorderPoint.minimum_quantity
         )
@@ -386,10 +390,10 @@ class InventoryReportGenerator:
         critical_alerts = alerts_query.filter(Product.quantity == 0).count()
         urgent_alerts = alerts_query.filter(
             Product.quantity > 0,
-            Product.quantity < ReorderPoint.minimum_quantity * 0.5
+            Product.quantity < ReorderPoint.warning_threshold
         ).count()
         warning_alerts = alerts_query.filter(
-            Product.quantity >= ReorderPoint.minimum_quantity * 0.5,
+            Product.quantity >= ReorderPoint.warning_threshold,
             Product.quantity < ReorderPoint.minimum_quantity
         ).count()
         
@@ -410,7 +414,7 @@ class InventoryReportGenerator:
         self._create_metrics_section(story, metrics)
         
         # Get top products by value
-        top_products = db.session.query(Product).filter(Product.quantity > 0).order_by(
+        top_products = db.session.query(Product).options(joinedload(Product.supplier)).filter(Product.quantity > 0).order_by(
             (Product.price * Product.quantity).desc()
         ).limit(20).all()
         
@@ -424,22 +428,23 @@ class InventoryReportGenerator:
             'critical_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'critical', 'suggested_order': rp.suggested_order_amount} 
                               for rp, p in alerts_query.filter(Product.quantity == 0).all()],
             'urgent_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'urgent', 'suggested_order': rp.suggested_order_amount}
-                            for rp, p in alerts_query.filter(Product.quantity > 0, Product.quantity < ReorderPoint.minimum_quantity * 0.5).all()],
+                            for rp, p in alerts_query.filter(Product.quantity > 0, Product.quantity < ReorderPoint.warning_threshold).all()],
             'warning_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'warning', 'suggested_order': rp.suggested_order_amount}
-                             for rp, p in alerts_query.filter(Product.quantity >= ReorderPoint.minimum_quantity * 0.5, Product.quantity < ReorderPoint.minimum_quantity).all()]
+                             for rp, p in alerts_query.filter(Product.quantity >= ReorderPoint.warning_threshold, Product.quantity < ReorderPoint.minimum_quantity).all()]
         }
         
         self._create_alerts_table(story, alerts_data)
         
         # Get supplier data
+        totals = supplier_product_totals()
         suppliers_data = db.session.query(
-            Supplier, 
-            db.func.count(Product.id).label('product_count'),
-            db.func.sum(Product.quantity).label('total_stock'),
-            db.func.sum(Product.price * Product.quantity).label('total_value')
-        ).outerjoin(Product).group_by(Supplier.id).having(
-            db.func.count(Product.id) > 0
-        ).order_by(db.func.sum(Product.price * Product.quantity).desc()).limit(10).all()
+            Supplier,
+            totals.c.product_count,
+            totals.c.total_stock,
+            totals.c.total_value
+        ).join(totals, totals.c.supplier_id == Supplier.id).order_by(
+            totals.c.total_value.desc()
+        ).limit(10).all()
         
         self._create_suppliers_section(story, suppliers_data)
         
@@ -466,7 +471,10 @@ class InventoryReportGenerator:
         self._create_header(story, "Low Stock Alert Report", report_date)
         
         # Get all alerts
-        alerts_query = db.session.query(ReorderPoint, Product).join(Product).filter(
+        alerts_query = db.session.query(ReorderPoint, Product).join(Product).outerjoin(Product.supplier).options(
+            contains_eager(ReorderPoint.product),  # suggested_order_amount reads rp.product
+            contains_eager(Product.supplier)  # Supplier name comes back with each alert row
+        ).filter(
             ReorderPoint.is_active == True,
             Product.quantity < ReorderPoint.minimum_quantity
         )
@@ -475,9 +483,9 @@ class InventoryReportGenerator:
             'critical_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'critical', 'suggested_order': rp.suggested_order_amount} 
                               for rp, p in alerts_query.filter(Product.quantity == 0).all()],
             'urgent_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'urgent', 'suggested_order': rp.suggested_order_amount}
-                            for rp, p in alerts_query.filter(Product.quantity > 0, Product.quantity < ReorderPoint.minimum_quantity * 0.5).all()],
+                            for rp, p in alerts_query.filter(Product.quantity > 0, Product.quantity < ReorderPoint.warning_threshold).all()],
             'warning_alerts': [{'product': p, 'reorder_point': rp, 'alert_level': 'warning', 'suggested_order': rp.suggested_order_amount}
-                             for rp, p in alerts_query.filter(Product.quantity >= ReorderPoint.minimum_quantity * 0.5, Product.quantity < ReorderPoint.minimum_quantity).all()]
+                             for rp, p in alerts_query.filter(Product.quantity >= ReorderPoint.warning_threshold, Product.quantity < ReorderPoint.minimum_quantity).all()]
         }
         
         total_alerts = len(alerts_data['critical_alerts']) + len(alerts_data['urgent_alerts']) + len(alerts_data['warning_alerts'])
@@ -527,13 +535,14 @@ class InventoryReportGenerator:
         self._create_header(story, "Supplier Performance Report", report_date)
         
         # Get all supplier data
+        totals = supplier_product_totals()
         suppliers_data = db.session.query(
-            Supplier, 
-            db.func.count(Product.id).label('product_count'),
-            db.func.sum(Product.quantity).label('total_stock'),
-            db.func.sum(Product.price * Product.quantity).label('total_value')
-        ).outerjoin(Product).group_by(Supplier.id).order_by(
-            db.func.sum(Product.price * Product.quantity).desc()
+            Supplier,
+            db.func.coalesce(totals.c.product_count, 0).label('product_count'),
+            totals.c.total_stock,
+            totals.c.total_value
+        ).outerjoin(totals, totals.c.supplier_id == Supplier.id).order_by(
+            totals.c.total_value.desc()
         ).all()
         
         # Calculate metrics
@@ -597,6 +606,8 @@ class InventoryReportGenerator:
         return buffer
 
 # Utility functions for easy integration
+# Each returns the in-memory BytesIO already rewound to position 0, ready to
+# hand straight to send_file (no getvalue() copy needed)
 def generate_inventory_summary_pdf():
     """Generate inventory summary PDF report"""
     generator = InventoryReportGenerator()